@@ -16,20 +16,69 @@ argparse_demo.py
 from __future__ import annotations
 
 import argparse
+import functools
+import itertools
+import math
+import operator
+import os
 import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List
 
 
+# Переменная окружения, отключающая быстрый путь для "greet NAME"
+NO_FAST_PATH_ENV = "ARGPARSE_DEMO_NO_FAST_PATH"
+
+# Размер блока чтения файла в handle_file_stats. Файл читается в текстовом
+# режиме, поэтому это 128 Ки символов: для UTF-8 это от 128 КиБ (латиница)
+# до примерно 256 КиБ (кириллица) и не больше 512 КиБ байтов за один блок.
+# Тем же числом задаётся буфер файла — он уже считается в байтах.
+READ_CHUNK_SIZE = 128 * 1024
+
+
 @dataclass
 class AppConfig:
     verbose: bool
     output: str | None
 
 
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(
+class CachedParser(argparse.ArgumentParser):
+    """
+    ArgumentParser, который переиспользует один форматтер для проверок.
+
+    При каждом add_argument argparse создаёт форматтер только ради проверки
+    metavar. Здесь для этой проверки берётся один закэшированный экземпляр;
+    справка и usage по-прежнему строятся свежим форматтером.
+    """
+
+    _cached_formatter: argparse.HelpFormatter | None = None
+    _reuse_formatter = False
+
+    def add_argument(self, *args, **kwargs):
+        self._reuse_formatter = True
+        try:
+            return super().add_argument(*args, **kwargs)
+        finally:
+            self._reuse_formatter = False
+
+    def _get_formatter(self) -> argparse.HelpFormatter:
+        if not self._reuse_formatter:
+            return super()._get_formatter()
+        if self._cached_formatter is None:
+            self._cached_formatter = super()._get_formatter()
+        return self._cached_formatter
+
+
+def build_parser(command: str | None = None) -> argparse.ArgumentParser:
+    """
+    Строит парсер аргументов.
+
+    Если передано имя подкоманды, создаётся только её подпарсер — остальные
+    не нужны для разбора текущего вызова. При command=None строятся все
+    подкоманды (например, для общей справки --help).
+    """
+    parser = CachedParser(
         prog="argparse-demo",
         description=(
             "Обучающий пример использования модуля argparse.\n"
@@ -67,8 +116,19 @@ def build_parser() -> argparse.ArgumentParser:
         required=True,
         metavar="COMMAND",
         help="действие, которое нужно выполнить (например, greet, calc, file)",
+        parser_class=CachedParser,
     )
 
+    if command in SUBCOMMAND_BUILDERS:
+        SUBCOMMAND_BUILDERS[command](subparsers)
+    else:
+        for build_subcommand in SUBCOMMAND_BUILDERS.values():
+            build_subcommand(subparsers)
+
+    return parser
+
+
+def _build_greet(subparsers: argparse._SubParsersAction) -> None:
     # Подкоманда greet
     greet = subparsers.add_parser(
         "greet",
@@ -90,6 +150,8 @@ def build_parser() -> argparse.ArgumentParser:
     )
     greet.set_defaults(func=handle_greet)
 
+
+def _build_calc(subparsers: argparse._SubParsersAction) -> None:
     # Подкоманда calc
     calc = subparsers.add_parser(
         "calc",
@@ -123,6 +185,8 @@ def build_parser() -> argparse.ArgumentParser:
     )
     calc.set_defaults(func=handle_calc)
 
+
+def _build_file(subparsers: argparse._SubParsersAction) -> None:
     # Подкоманда file
     file_cmd = subparsers.add_parser(
         "file",
@@ -134,6 +198,7 @@ def build_parser() -> argparse.ArgumentParser:
         dest="file_command",
         required=True,
         metavar="FILE_CMD",
+        parser_class=CachedParser,
     )
 
     stats_cmd = file_sub.add_parser(
@@ -147,7 +212,65 @@ def build_parser() -> argparse.ArgumentParser:
     )
     stats_cmd.set_defaults(func=handle_file_stats)
 
-    return parser
+
+# Порядок важен: в нём подкоманды перечисляются в справке
+SUBCOMMAND_BUILDERS = {
+    "greet": _build_greet,
+    "calc": _build_calc,
+    "file": _build_file,
+}
+
+
+def peek_command(argv: list[str]) -> str | None:
+    """
+    Заранее определяет подкоманду по списку аргументов.
+
+    Возвращает None, если подкоманду нельзя надёжно определить: запрошена
+    справка, аргументы читаются из файла (@args.txt), встретилась незнакомая
+    опция или имя подкоманды неизвестно.
+    """
+    tokens = iter(argv)
+    for token in tokens:
+        if token.startswith("@"):
+            return None
+        if token.startswith("--"):
+            name = token.split("=", 1)[0]
+            # argparse принимает и сокращения длинных опций (--out вместо --output)
+            if len(name) > 2 and "--verbose".startswith(name):
+                continue
+            if len(name) > 2 and "--output".startswith(name):
+                if "=" not in token:
+                    next(tokens, None)
+                continue
+            # Сюда попадают --help, неизвестные опции и сам "--": argparse
+            # 3.10/3.11 принимает "--" за имя подкоманды, и для понятной
+            # ошибки нужен полный парсер
+            return None
+        if token.startswith("-") and len(token) > 1:
+            # Группа коротких флагов: -v, -o PATH, -oPATH, -vo PATH
+            for i, flag in enumerate(token[1:], start=1):
+                if flag == "v":
+                    continue
+                if flag == "o":
+                    if i == len(token) - 1:
+                        next(tokens, None)
+                    break
+                return None
+            continue
+        return token if token in SUBCOMMAND_BUILDERS else None
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def get_parser(command: str | None = None) -> argparse.ArgumentParser:
+    """
+    Возвращает парсер для подкоманды, построенный один раз за процесс.
+
+    Повторно использовать парсер безопасно: parse_args() не меняет его
+    настройки, а каждый разбор создаёт новый Namespace. Кэш ограничен
+    числом подкоманд плюс вариант "все подкоманды" (command=None).
+    """
+    return build_parser(command)
 
 
 def get_config(args: argparse.Namespace) -> AppConfig:
@@ -172,25 +295,48 @@ def write_output(lines: List[str], config: AppConfig) -> None:
         print(text)
 
 
-def handle_greet(args: argparse.Namespace, config: AppConfig) -> None:
-    name = args.name
-    times = args.times
-    if times < 1:
-        raise SystemExit("Количество повторов должно быть >= 1")
-
+def greet_lines(name: str, times: int, shout: bool, verbose: bool) -> List[str]:
     base = f"Привет, {name}!"
-    if args.shout:
+    if shout:
         base = base.upper()
 
     header = f"Блок приветствия для: {name}"
     lines = [header, "-" * len(header)]
     for i in range(times):
-        if config.verbose:
+        if verbose:
             lines.append(f"[{i + 1}] {base}")
         else:
             lines.append(base)
+    return lines
 
-    write_output(lines, config)
+
+def handle_greet(args: argparse.Namespace, config: AppConfig) -> None:
+    times = args.times
+    if times < 1:
+        raise SystemExit("Количество повторов должно быть >= 1")
+
+    write_output(greet_lines(args.name, times, args.shout, config.verbose), config)
+
+
+def is_fast_greet(argv: list[str]) -> bool:
+    """
+    Проверяет, что вызов имеет вид "greet NAME" без каких-либо опций.
+
+    Такой вызов можно обработать без argparse. Быстрый путь отключается
+    переменной окружения ARGPARSE_DEMO_NO_FAST_PATH.
+    """
+    return (
+        len(argv) == 2
+        and argv[0] == "greet"
+        and not argv[1].startswith(("-", "@"))
+        and not os.environ.get(NO_FAST_PATH_ENV)
+    )
+
+
+def fast_greet(name: str) -> int:
+    # Результат тот же, что у "greet NAME" через полный разбор аргументов
+    write_output(greet_lines(name, 1, False, False), AppConfig(verbose=False, output=None))
+    return 0
 
 
 def handle_calc(args: argparse.Namespace, config: AppConfig) -> None:
@@ -201,21 +347,16 @@ def handle_calc(args: argparse.Namespace, config: AppConfig) -> None:
         result = sum(nums)
         desc = "сумма"
     elif op == "sub":
-        result = nums[0]
-        for n in nums[1:]:
-            result -= n
+        result = functools.reduce(operator.sub, nums)
         desc = "вычитание"
     elif op == "mul":
-        result = 1
-        for n in nums:
-            result *= n
+        result = math.prod(nums)
         desc = "умножение"
     elif op == "div":
-        result = nums[0]
-        for n in nums[1:]:
-            if n == 0:
-                raise SystemExit("Деление на ноль запрещено")
-            result /= n
+        # Проверка "in" идёт внутри интерпретатора, без копии списка
+        if 0 in itertools.islice(nums, 1, None):
+            raise SystemExit("Деление на ноль запрещено")
+        result = functools.reduce(operator.truediv, nums)
         desc = "деление"
     else:
         raise SystemExit(f"Неизвестная операция: {op}")
@@ -248,10 +389,20 @@ def handle_file_stats(args: argparse.Namespace, config: AppConfig) -> None:
     if not path.is_file():
         raise SystemExit(f"Ожидался файл, но это не файл: {path}")
 
-    text = path.read_text(encoding="utf-8")
-    lines_count = text.count("\n") + (0 if text.endswith("\n") else 1 if text else 0)
-    words_count = len(text.split())
-    chars_count = len(text)
+    # Читаем файл кусками, чтобы не держать в памяти весь текст целиком
+    lines_count = words_count = chars_count = 0
+    last_char = ""
+    with path.open("r", encoding="utf-8", buffering=READ_CHUNK_SIZE) as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), ""):
+            chars_count += len(chunk)
+            lines_count += chunk.count("\n")
+            words_count += len(chunk.split())
+            # Слово, разрезанное границей кусков, посчитано дважды
+            if last_char and not last_char.isspace() and not chunk[0].isspace():
+                words_count -= 1
+            last_char = chunk[-1]
+    if last_char and last_char != "\n":
+        lines_count += 1
 
     header = f"Статистика по файлу"
     result_lines = [
@@ -269,11 +420,14 @@ def handle_file_stats(args: argparse.Namespace, config: AppConfig) -> None:
 
 
 def main(argv: list[str] | None = None) -> int:
-    parser = build_parser()
-
     if argv is None:
         argv = sys.argv[1:]
 
+    if is_fast_greet(argv):
+        return fast_greet(argv[1])
+
+    parser = get_parser(peek_command(argv))
+
     args = parser.parse_args(argv)
     config = get_config(args)
 
@@ -1,29 +1,62 @@
 from __future__ import annotations
 
+import atexit
 import json
+import os
 import sys
 import time
-from dataclasses import dataclass, asdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
 
-from rich import box
-from rich.console import Console
-from rich.prompt import Prompt, Confirm, IntPrompt
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeElapsedColumn
-from rich.panel import Panel
-from rich.traceback import install
+try:
+    # orjson заметно быстрее стандартного json; если его нет — работаем без него
+    import orjson
 
-# Включаем красивый вывод трассировок ошибок
-install(show_locals=True)
+    def _loads(data: bytes):
+        return orjson.loads(data)
 
-console = Console()
+    def _dumps(obj) -> bytes:
+        # Dataclass-объекты (Task) orjson сериализует сам
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+except ImportError:
+
+    def _loads(data: bytes):
+        return json.loads(data)
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(
+            obj, ensure_ascii=False, indent=2, default=lambda o: o.to_dict()
+        ).encode("utf-8")
+
+
+# Модули rich импортируются внутри функций, которые их используют:
+# так запуск программы не платит за то, что в этом сеансе не понадобится.
+if TYPE_CHECKING:
+    from rich.console import Console
+
+_console: Optional[Console] = None
 DATA_FILE = Path("tasks.json")
 
 
-@dataclass
+def get_console() -> Console:
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+def timestamp() -> str:
+    """Текущее время в формате, в котором оно хранится в задачах."""
+    return datetime.now().isoformat(timespec="seconds")
+
+
+@dataclass(slots=True)
 class Task:
     id: int
     title: str
@@ -45,44 +78,172 @@ class Task:
             updated_at=data["updated_at"],
         )
 
+    def to_dict(self) -> dict:
+        # Все поля примитивные, поэтому глубокое копирование asdict() не нужно
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "status": self.status,
+            "priority": self.priority,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
 
 class TaskRepository:
     def __init__(self, path: Path) -> None:
         self.path = path
-        self.tasks: List[Task] = []
+        # Задачи по ID; словарь сохраняет порядок добавления
+        self._by_id: Dict[int, Task] = {}
+        # Индекс по статусу: статус -> {ID: задача}
+        self._by_status: Dict[str, Dict[int, Task]] = {}
+        self._max_id = 0
+        # Изменения копятся в памяти и пишутся на диск одним flush()
+        self._dirty = False
+        self._flush_registered = False
+        # Один поток — записи выполняются строго по очереди
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        # Последняя отправленная фоновая запись (её ошибку нужно не потерять)
+        self._pending: Optional[Future] = None
         self._load()
 
     def _load(self) -> None:
         if not self.path.exists():
-            self.tasks = []
+            self._by_id = {}
+            self._by_status = {}
+            self._max_id = 0
             return
         try:
-            with self.path.open("r", encoding="utf-8") as f:
-                raw = json.load(f)
-            self.tasks = [Task.from_dict(item) for item in raw]
+            raw = _loads(self.path.read_bytes())
+            tasks = [Task.from_dict(item) for item in raw]
         except Exception as e:
-            console.print(
-                Panel.fit(
-                    f"[red]Ошибка чтения файла данных:[/red] {e}\n"
-                    f"Файл: {self.path.resolve()}",
-                    title="Ошибка",
-                    border_style="red",
-                )
+            self._show_load_error(f"[red]Ошибка чтения файла данных:[/red] {e}")
+            tasks = []
+        self._by_id = {}
+        duplicates = []
+        for task in tasks:
+            if task.id in self._by_id:
+                duplicates.append(task)
+            else:
+                self._by_id[task.id] = task
+        # Запоминаем максимальный ID, чтобы не искать его при каждом add()
+        self._max_id = max(self._by_id, default=0)
+        if duplicates:
+            # Задачи с повторяющимся ID (например, после ручной правки файла)
+            # не выбрасываем, а выдаём им новые номера
+            renumbered = []
+            for task in duplicates:
+                old_id = task.id
+                self._max_id += 1
+                task.id = self._max_id
+                self._by_id[task.id] = task
+                renumbered.append(f"{old_id} → {task.id}")
+            self._show_load_error(
+                "[red]В файле данных повторяются ID задач.[/red]\n"
+                f"Задачам выданы новые ID: {', '.join(renumbered)}"
+            )
+        self._by_status = {}
+        for task in self._by_id.values():
+            self._by_status.setdefault(task.status, {})[task.id] = task
+
+    def _show_load_error(self, message: str) -> None:
+        from rich.panel import Panel
+
+        get_console().print(
+            Panel.fit(
+                f"{message}\n"
+                f"Файл: {self.path.resolve()}",
+                title="Ошибка",
+                border_style="red",
             )
-            self.tasks = []
+        )
+
+    def _set_status(self, task: Task, new_status: str, now: str) -> None:
+        # Статус меняется только здесь, чтобы индекс _by_status не разошёлся с задачами
+        self._by_status[task.status].pop(task.id, None)
+        self._by_status.setdefault(new_status, {})[task.id] = task
+        task.status = new_status
+        task.updated_at = now
 
     def _save(self) -> None:
-        data = [asdict(task) for task in self.tasks]
-        with self.path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # Снимок данных готовим сразу, а запись на диск уходит в фоновый поток,
+        # чтобы интерфейс не ждал медленный диск
+        payload = _dumps(list(self._by_id.values()))
+        self._wait_pending()
+        self._pending = self._executor.submit(self._write_file, payload)
+
+    def _wait_pending(self) -> None:
+        # Дожидаемся предыдущей фоновой записи. Если она не удалась, изменения
+        # снова считаются несохранёнными, а ошибка передаётся вызывающему
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        try:
+            pending.result()
+        except Exception:
+            self._dirty = True
+            raise
+
+    def _write_file(self, payload: bytes) -> None:
+        # Пишем во временный файл и подменяем им основной: сбой посреди
+        # записи не оставит tasks.json наполовину записанным
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with tmp.open("wb") as f:
+                # Весь файл уходит на диск одним вызовом write
+                f.write(payload)
+                f.flush()
+                # Данные должны физически оказаться на диске до подмены,
+                # иначе после сбоя питания tasks.json может оказаться пустым
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        if not self._flush_registered:
+            atexit.register(self.close)
+            self._flush_registered = True
+
+    def flush(self) -> None:
+        """
+        Отправляет накопленные изменения на запись в файл (если они есть).
+
+        Ошибка предыдущей фоновой записи поднимается здесь; в этом случае
+        изменения остаются помеченными как несохранённые.
+        """
+        if not self._dirty:
+            self._wait_pending()
+            return
+        self._save()
+        self._dirty = False
+
+    def close(self) -> None:
+        """Дожидается фоновых записей и синхронно сохраняет остаток изменений."""
+        try:
+            self._wait_pending()
+        except Exception:
+            # Неудавшаяся фоновая запись повторяется ниже синхронно:
+            # если и она не пройдёт, ошибка дойдёт до вызывающего
+            pass
+        if self._dirty:
+            self._write_file(_dumps(list(self._by_id.values())))
+            self._dirty = False
+        # Поток записи останавливаем только после успешного сохранения,
+        # чтобы после ошибки flush() продолжал работать
+        self._executor.shutdown(wait=True)
 
     def next_id(self) -> int:
-        if not self.tasks:
-            return 1
-        return max(task.id for task in self.tasks) + 1
+        # В пределах сеанса ID только растут: номер удалённой задачи повторно
+        # не выдаётся. После перезапуска _max_id считается по оставшимся задачам,
+        # поэтому номер удалённой последней задачи может освободиться
+        return self._max_id + 1
 
     def add(self, title: str, description: str, priority: int) -> Task:
-        now = datetime.now().isoformat(timespec="seconds")
+        now = timestamp()
         task = Task(
             id=self.next_id(),
             title=title,
@@ -92,45 +253,98 @@ class TaskRepository:
             created_at=now,
             updated_at=now,
         )
-        self.tasks.append(task)
-        self._save()
+        self._by_id[task.id] = task
+        self._by_status.setdefault(task.status, {})[task.id] = task
+        self._max_id = task.id
+        self._mark_dirty()
         return task
 
+    @property
+    def tasks(self) -> List[Task]:
+        return list(self._by_id.values())
+
     def find(self, task_id: int) -> Optional[Task]:
-        for t in self.tasks:
-            if t.id == task_id:
-                return t
-        return None
+        return self._by_id.get(task_id)
 
     def update_status(self, task_id: int, new_status: str) -> bool:
         task = self.find(task_id)
         if not task:
             return False
-        task.status = new_status
-        task.updated_at = datetime.now().isoformat(timespec="seconds")
-        self._save()
+        self._set_status(task, new_status, timestamp())
+        self._mark_dirty()
         return True
 
+    def bulk_update_status(self, ids: Iterable[int], new_status: str) -> int:
+        """Меняет статус сразу у нескольких задач; возвращает число изменённых."""
+        # Одна отметка времени на всю пакетную операцию
+        now = timestamp()
+        updated = 0
+        for task_id in ids:
+            task = self._by_id.get(task_id)
+            if task:
+                self._set_status(task, new_status, now)
+                updated += 1
+        if updated:
+            self._mark_dirty()
+        return updated
+
     def delete(self, task_id: int) -> bool:
-        before = len(self.tasks)
-        self.tasks = [t for t in self.tasks if t.id != task_id]
-        if len(self.tasks) == before:
+        task = self._by_id.pop(task_id, None)
+        if task is None:
             return False
-        self._save()
+        del self._by_status[task.status][task_id]
+        self._mark_dirty()
         return True
 
     def all(self) -> List[Task]:
-        return list(self.tasks)
+        return list(self._by_id.values())
 
     def filter_by_status(self, status: str) -> List[Task]:
-        return [t for t in self.tasks if t.status == status]
+        # Берём задачи из индекса, не просматривая весь список; порядок — по ID
+        bucket = self._by_status.get(status, {})
+        return [bucket[task_id] for task_id in sorted(bucket)]
+
+
+# Готовые строки для ячеек таблицы: заранее собраны звёзды для обычных
+# приоритетов 0..5 (другие значения строятся на месте в priority_markup)
+# и разметка для трёх статусов, чтобы не собирать их для каждой строки
+_STARS = tuple("★" * p + "☆" * (5 - p) for p in range(6))
+_PRIORITY_MARKUP = tuple(f"[bold]{stars}[/]" for stars in _STARS)
+_STATUS_MARKUP = {
+    "todo": "[yellow]todo[/]",
+    "in_progress": "[blue]in_progress[/]",
+    "done": "[green]done[/]",
+}
+
+
+def priority_markup(priority: int) -> str:
+    # Приоритет проверяется только при вводе, а в отредактированном вручную
+    # tasks.json может оказаться любым — тогда строим строку на месте
+    if 0 <= priority <= 5:
+        return _PRIORITY_MARKUP[priority]
+    return f"[bold]{'★' * priority + '☆' * (5 - priority)}[/]"
+
+
+# Начиная с этого числа строк таблица задач рисуется в упрощённом виде
+LARGE_TABLE_ROWS = 1000
 
 
 def render_tasks_table(tasks: List[Task], title: str = "Список задач") -> None:
+    from rich import box
+    from rich.panel import Panel
+    from rich.table import Table
+
+    if not tasks:
+        get_console().print(Panel("Пока нет задач", title=title, border_style="yellow"))
+        return
+
+    # Для больших списков отключаем линии между строками: их отрисовка
+    # примерно удваивает время вывода таблицы
+    large = len(tasks) > LARGE_TABLE_ROWS
     table = Table(
         title=title,
-        box=box.MINIMAL_DOUBLE_HEAD,
-        show_lines=True,
+        box=box.SIMPLE if large else box.MINIMAL_DOUBLE_HEAD,
+        show_lines=not large,
         header_style="bold cyan",
     )
     table.add_column("ID", justify="right", style="bold")
@@ -140,32 +354,27 @@ def render_tasks_table(tasks: List[Task], title: str = "Список задач"
     table.add_column("Создана", style="dim")
     table.add_column("Обновлена", style="dim")
 
-    status_colors = {
-        "todo": "yellow",
-        "in_progress": "blue",
-        "done": "green",
-    }
-
-    for task in tasks:
-        status_text = f"[{status_colors.get(task.status, 'white')}]{task.status}[/]"
-        priority_stars = "★" * task.priority + "☆" * (5 - task.priority)
-        table.add_row(
-            str(task.id),
-            task.title,
-            status_text,
-            f"[bold]{priority_stars}[/]",
-            task.created_at,
-            task.updated_at,
+    rows = [
+        (
+            str(t.id),
+            t.title,
+            _STATUS_MARKUP.get(t.status) or f"[white]{t.status}[/]",
+            priority_markup(t.priority),
+            t.created_at,
+            t.updated_at,
         )
+        for t in tasks
+    ]
+    for row in rows:
+        table.add_row(*row)
 
-    if not tasks:
-        console.print(Panel("Пока нет задач", title=title, border_style="yellow"))
-    else:
-        console.print(table)
+    get_console().print(table, soft_wrap=large)
 
 
 def show_header() -> None:
-    console.print(
+    from rich.panel import Panel
+
+    get_console().print(
         Panel.fit(
             "[bold cyan]Трекер задач на базе библиотеки Rich[/bold cyan]\n"
             "[dim]Демонстрация работы с таблицами, прогрессом и ошибками[/dim]",
@@ -175,7 +384,10 @@ def show_header() -> None:
 
 
 def show_menu() -> str:
-    console.print(
+    from rich.panel import Panel
+    from rich.prompt import Prompt
+
+    get_console().print(
         Panel.fit(
             "\n".join(
                 [
@@ -195,10 +407,13 @@ def show_menu() -> str:
 
 
 def add_task_flow(repo: TaskRepository) -> None:
-    console.print("[bold]Добавление новой задачи[/bold]")
+    from rich.panel import Panel
+    from rich.prompt import IntPrompt, Prompt
+
+    get_console().print("[bold]Добавление новой задачи[/bold]")
     title = Prompt.ask("Заголовок задачи").strip()
     if not title:
-        console.print("[red]Заголовок не может быть пустым[/red]")
+        get_console().print("[red]Заголовок не может быть пустым[/red]")
         return
     description = Prompt.ask("Описание задачи (можно оставить пустым)", default="").strip()
     while True:
@@ -208,9 +423,9 @@ def add_task_flow(repo: TaskRepository) -> None:
                 raise ValueError
             break
         except Exception:
-            console.print("[red]Введите целое число от 1 до 5[/red]")
+            get_console().print("[red]Введите целое число от 1 до 5[/red]")
     task = repo.add(title, description, priority)
-    console.print(
+    get_console().print(
         Panel.fit(
             f"Задача [bold]{task.title}[/bold] (ID={task.id}) добавлена",
             border_style="green",
@@ -219,23 +434,25 @@ def add_task_flow(repo: TaskRepository) -> None:
 
 
 def change_status_flow(repo: TaskRepository) -> None:
+    from rich.prompt import IntPrompt, Prompt
+
     if not repo.all():
-        console.print("[yellow]Нет задач для обновления статуса[/yellow]")
+        get_console().print("[yellow]Нет задач для обновления статуса[/yellow]")
         return
 
     render_tasks_table(repo.all(), title="Текущие задачи")
     try:
         task_id = IntPrompt.ask("Введите ID задачи")
     except Exception:
-        console.print("[red]Неверный ID[/red]")
+        get_console().print("[red]Неверный ID[/red]")
         return
 
     task = repo.find(task_id)
     if not task:
-        console.print(f"[red]Задача с ID={task_id} не найдена[/red]")
+        get_console().print(f"[red]Задача с ID={task_id} не найдена[/red]")
         return
 
-    console.print(f"Текущий статус: [bold]{task.status}[/bold]")
+    get_console().print(f"Текущий статус: [bold]{task.status}[/bold]")
     status = Prompt.ask(
         "Новый статус",
         choices=["todo", "in_progress", "done"],
@@ -243,46 +460,57 @@ def change_status_flow(repo: TaskRepository) -> None:
     )
     ok = repo.update_status(task_id, status)
     if ok:
-        console.print("[green]Статус успешно обновлён[/green]")
+        get_console().print("[green]Статус успешно обновлён[/green]")
     else:
-        console.print("[red]Не удалось обновить статус[/red]")
+        get_console().print("[red]Не удалось обновить статус[/red]")
 
 
 def delete_task_flow(repo: TaskRepository) -> None:
+    from rich.prompt import Confirm, IntPrompt
+
     if not repo.all():
-        console.print("[yellow]Нет задач для удаления[/yellow]")
+        get_console().print("[yellow]Нет задач для удаления[/yellow]")
         return
 
     render_tasks_table(repo.all(), title="Текущие задачи")
     try:
         task_id = IntPrompt.ask("Введите ID задачи для удаления")
     except Exception:
-        console.print("[red]Неверный ID[/red]")
+        get_console().print("[red]Неверный ID[/red]")
         return
 
     task = repo.find(task_id)
     if not task:
-        console.print(f"[red]Задача с ID={task_id} не найдена[/red]")
+        get_console().print(f"[red]Задача с ID={task_id} не найдена[/red]")
         return
 
     if not Confirm.ask(f"Точно удалить задачу [bold]{task.title}[/bold]?", default=False):
-        console.print("[yellow]Удаление отменено[/yellow]")
+        get_console().print("[yellow]Удаление отменено[/yellow]")
         return
 
     ok = repo.delete(task_id)
     if ok:
-        console.print("[green]Задача удалена[/green]")
+        get_console().print("[green]Задача удалена[/green]")
     else:
-        console.print("[red]Не удалось удалить задачу[/red]")
+        get_console().print("[red]Не удалось удалить задачу[/red]")
 
 
 def simulate_progress_flow(repo: TaskRepository) -> None:
+    from rich.panel import Panel
+    from rich.progress import (
+        BarColumn,
+        Progress,
+        SpinnerColumn,
+        TextColumn,
+        TimeElapsedColumn,
+    )
+
     tasks = repo.filter_by_status("in_progress") or repo.filter_by_status("todo")
     if not tasks:
-        console.print("[yellow]Нет задач в статусе 'todo' или 'in_progress' для симуляции[/yellow]")
+        get_console().print("[yellow]Нет задач в статусе 'todo' или 'in_progress' для симуляции[/yellow]")
         return
 
-    console.print(
+    get_console().print(
         Panel.fit(
             "Симуляция выполнения задач с помощью прогресс-бара Rich",
             border_style="blue",
@@ -295,28 +523,38 @@ def simulate_progress_flow(repo: TaskRepository) -> None:
         BarColumn(),
         TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
         TimeElapsedColumn(),
-        console=console,
+        console=get_console(),
         transient=True,
+        auto_refresh=True,
+        refresh_per_second=10,
     ) as progress:
         task_ids = []
         for t in tasks:
             task_id = progress.add_task(f"Задача {t.id}: {t.title}", total=100)
             task_ids.append((task_id, t))
 
-        # Простейшая симуляция — идём по шагам
+        # Простейшая симуляция — идём по шагам. Экран перерисовывает фоновое
+        # автообновление, а не каждый вызов update()
         for step in range(0, 101, 10):
-            for task_id, t in task_ids:
-                progress.update(task_id, completed=step)
+            for task_id, _ in task_ids:
+                progress.update(task_id, completed=step, refresh=False)
             time.sleep(0.2)
+        progress.refresh()
 
     # После симуляции все задачи помечаем как done
-    for _, t in task_ids:
-        repo.update_status(t.id, "done")
+    repo.bulk_update_status([t.id for _, t in task_ids], "done")
 
-    console.print("[green]Симуляция завершена, задачи помечены как 'done'[/green]")
+    get_console().print("[green]Симуляция завершена, задачи помечены как 'done'[/green]")
 
 
 def main() -> None:
+    from rich.panel import Panel
+    from rich.prompt import Confirm
+    from rich.traceback import install
+
+    # Включаем красивый вывод трассировок ошибок
+    install(show_locals=True)
+
     repo = TaskRepository(DATA_FILE)
     show_header()
 
@@ -324,7 +562,8 @@ def main() -> None:
         try:
             choice = show_menu()
             if choice == "0":
-                console.print("[bold cyan]До встречи![/bold cyan]")
+                repo.close()
+                get_console().print("[bold cyan]До встречи![/bold cyan]")
                 break
             elif choice == "1":
                 render_tasks_table(repo.all(), title="Все задачи")
@@ -336,13 +575,15 @@ def main() -> None:
                 delete_task_flow(repo)
             elif choice == "5":
                 simulate_progress_flow(repo)
+            # Изменения пункта меню сохраняются одной фоновой записью
+            repo.flush()
         except KeyboardInterrupt:
-            console.print("\n[red]Прерывание по Ctrl+C[/red]")
+            get_console().print("\n[red]Прерывание по Ctrl+C[/red]")
             if Confirm.ask("Выйти из программы?", default=True):
                 break
         except Exception as e:
             # Демонстрация обработки ошибок + Rich Traceback
-            console.print(
+            get_console().print(
                 Panel.fit(
                     f"[red]Непредвиденная ошибка:[/red] {e}",
                     title="Ошибка",
@@ -352,8 +593,7 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    # Если rich не установлен, это проявится уже при импорте выше.
-    # Здесь просто запускаем программу.
+    # Если rich не установлен, это проявится при первом импорте внутри main().
     try:
         main()
     except ModuleNotFoundError: